@@ -1,46 +1,126 @@
 import logging
-from typing import Any, Dict, Iterable, List, Optional
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
 
-import requests
+from .throttle import AdaptiveLimiter, CircuitBreaker, parse_retry_after
+from .transport import get_session
+
+
+def _page_rows(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = payload.get("rows") or []
+    if not isinstance(rows, list):
+        return []
+    return rows
 
 
 class SnipeItClient:
-    def __init__(self, base_url: str, token: str, timeout_seconds: int = 30) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        timeout_seconds: int = 30,
+        session: Optional[Any] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        max_attempts: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Authorization": f"Bearer {token}",
-                "Accept": "application/json",
-            }
-        )
+        self.session = session if session is not None else get_session("snipeit")
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
         self.timeout_seconds = timeout_seconds
+        self.limiter = limiter if limiter is not None else AdaptiveLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.max_attempts = max(1, max_attempts)
+        self._clock = clock
+        self._sleep = sleep
 
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
-        resp = self.session.get(url, params=params or {}, timeout=self.timeout_seconds)
-        resp.raise_for_status()
-        return resp.json()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.wait_until_closed()
+            self.limiter.acquire()
+            started = self._clock()
+            try:
+                resp = self.session.get(
+                    url, params=params or {}, headers=self.headers, timeout=self.timeout_seconds
+                )
+            except Exception:
+                self.limiter.release(throttled=True)
+                self.breaker.record_failure()
+                raise
+            latency = self._clock() - started
+            retryable = resp.status_code == 429 or resp.status_code >= 500
+            self.limiter.release(latency, throttled=retryable)
+            if not retryable:
+                self.breaker.record_success()
+                resp.raise_for_status()
+                return resp.json()
+
+            self.breaker.record_failure()
+            if attempt >= self.max_attempts:
+                resp.raise_for_status()
+            delay = parse_retry_after(resp.headers.get("Retry-After"))
+            if delay is None:
+                delay = min(30.0, 2 ** (attempt - 1)) + random.uniform(0, 0.5)
+            delay = min(delay, self.breaker.reset_seconds)
+            logging.warning(
+                "Snipe-IT %s returned %s, retry %s/%s in %.1f s (concurrency %s)",
+                endpoint,
+                resp.status_code,
+                attempt,
+                self.max_attempts - 1,
+                delay,
+                int(self.limiter.limit),
+            )
+            self._sleep(delay)
 
     def get_paginated(self, endpoint: str, page_size: int = 100) -> Iterable[Dict[str, Any]]:
-        offset = 0
-        while True:
-            params = {"limit": page_size, "offset": offset}
-            payload = self.get(endpoint, params=params)
-            rows = payload.get("rows") or []
-            if not isinstance(rows, list):
-                rows = []
-            for row in rows:
-                yield row
-            total = payload.get("total")
-            if total is None:
-                if len(rows) < page_size:
-                    break
+        payload = self.get(endpoint, params={"limit": page_size, "offset": 0})
+        rows = _page_rows(payload)
+        yield from rows
+        total = payload.get("total")
+        if total is None:
+            # Without a total the page count is unknown, so fall back to walking pages.
+            offset = 0
+            while len(rows) >= page_size:
                 offset += page_size
-                continue
-            if offset + page_size >= int(total):
-                break
-            offset += page_size
+                rows = _page_rows(self.get(endpoint, params={"limit": page_size, "offset": offset}))
+                yield from rows
+            return
+
+        offsets = deque(range(page_size, int(total), page_size))
+        if not offsets:
+            return
+        # Remaining pages are fetched in parallel through the limiter; at most
+        # two pages per slot are in flight or buffered so memory stays bounded.
+        # Tasks run in a copy of the caller's context (the simulation keeps its
+        # virtual clock there).
+        window = 2 * self.limiter.maximum
+        with ThreadPoolExecutor(max_workers=self.limiter.maximum) as pool:
+            pending: Deque[Future] = deque()
+            while offsets or pending:
+                while offsets and len(pending) < window:
+                    params = {"limit": page_size, "offset": offsets.popleft()}
+                    pending.append(pool.submit(copy_context().run, self.get, endpoint, params))
+                yield from _page_rows(pending.popleft().result())
+
+    def get_license(self, license_id: int) -> Optional[Dict[str, Any]]:
+        payload = self.get(f"/licenses/{license_id}")
+        # Snipe-IT answers 200 with {"status": "error"} for missing objects.
+        if payload.get("status") == "error" or payload.get("id") is None:
+            return None
+        return payload
 
     def list_licenses(self, page_size: int = 100) -> List[Dict[str, Any]]:
         return list(self.get_paginated("/licenses", page_size=page_size))
@@ -48,12 +128,31 @@ class SnipeItClient:
     def list_license_seats(self, license_id: int, page_size: int = 100) -> List[Dict[str, Any]]:
         return list(self.get_paginated(f"/licenses/{license_id}/seats", page_size=page_size))
 
+    def list_license_seats_many(
+        self, license_ids: Iterable[int], page_size: int = 100
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        ids = list(dict.fromkeys(license_ids))
+        if not ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.limiter.maximum) as pool:
+            futures = [
+                pool.submit(copy_context().run, self.list_license_seats, lid, page_size)
+                for lid in ids
+            ]
+            return {lid: future.result() for lid, future in zip(ids, futures)}
+
 
 class TelegramClient:
-    def __init__(self, token: str, timeout_seconds: int = 30, dry_run: bool = False) -> None:
+    def __init__(
+        self,
+        token: str,
+        timeout_seconds: int = 30,
+        dry_run: bool = False,
+        session: Optional[Any] = None,
+    ) -> None:
         self.token = token
         self.base_url = f"https://api.telegram.org/bot{token}"
-        self.session = requests.Session()
+        self.session = session if session is not None else get_session("telegram")
         self.timeout_seconds = timeout_seconds
         self.dry_run = dry_run
 
@@ -13,6 +13,8 @@ class Config:
         self.user_map_path = os.getenv("USER_CHAT_MAP_PATH", "user_map.json").strip()
         self.notify_days = int(os.getenv("NOTIFY_DAYS", "14"))
         self.notify_only_on_day = os.getenv("NOTIFY_ONLY_ON_DAY", "").strip()
+        self.notify_thresholds = os.getenv("NOTIFY_THRESHOLDS", "").strip()
+        self.timeline_refresh_days = int(os.getenv("TIMELINE_REFRESH_DAYS", "7"))
         self.include_expired = _to_bool(os.getenv("INCLUDE_EXPIRED", "false"))
         self.run_mode = os.getenv("RUN_MODE", "once").strip().lower()
         self.schedule_time = os.getenv("SCHEDULE_TIME", "12:00").strip()
@@ -28,6 +30,26 @@ class Config:
         ]
         self.poll_seconds = int(os.getenv("POLL_SECONDS", "30"))
         self.state_path = os.getenv("STATE_PATH", "state.json").strip()
+        self.http_pool_connections = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+        self.http_pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+        self.http_retries = int(os.getenv("HTTP_RETRIES", "3"))
+        self.http_backoff = float(os.getenv("HTTP_BACKOFF", "0.5"))
+        self.http2 = _to_bool(os.getenv("HTTP2", "false"))
+        self.snipeit_min_concurrency = int(os.getenv("SNIPEIT_MIN_CONCURRENCY", "1"))
+        self.snipeit_max_concurrency = int(os.getenv("SNIPEIT_MAX_CONCURRENCY", "8"))
+        self.snipeit_target_latency_ms = int(os.getenv("SNIPEIT_TARGET_LATENCY_MS", "1000"))
+        self.snipeit_max_attempts = int(os.getenv("SNIPEIT_MAX_ATTEMPTS", "5"))
+        self.circuit_failure_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.circuit_reset_seconds = int(os.getenv("CIRCUIT_RESET_SECONDS", "60"))
+        self.export_chunk_size = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+        self.sim_snipeit_latency_ms = int(os.getenv("SIM_SNIPEIT_LATENCY_MS", "150"))
+        self.sim_snipeit_rate_per_minute = int(os.getenv("SIM_SNIPEIT_RATE_PER_MINUTE", "120"))
+        self.sim_telegram_latency_ms = int(os.getenv("SIM_TELEGRAM_LATENCY_MS", "100"))
+        self.sim_telegram_rate_per_second = int(os.getenv("SIM_TELEGRAM_RATE_PER_SECOND", "30"))
+        self.sim_telegram_per_chat_per_second = int(
+            os.getenv("SIM_TELEGRAM_PER_CHAT_PER_SECOND", "1")
+        )
+        self.startup_budget_ms = int(os.getenv("STARTUP_BUDGET_MS", "500"))
 
     def normalize(self) -> None:
         if not self.base_url:
@@ -40,13 +62,14 @@ class Config:
         else:
             self.base_url = f"{url}/api/v1"
 
-    def validate(self) -> None:
+    def validate(self, require_telegram: bool = True) -> None:
+        # --export and --sync-users only talk to Snipe-IT.
         missing = []
         if not self.base_url:
             missing.append("SNIPEIT_BASE_URL")
         if not self.api_token:
             missing.append("SNIPEIT_API_TOKEN")
-        if not self.telegram_token:
+        if require_telegram and not self.telegram_token:
             missing.append("TELEGRAM_BOT_TOKEN")
         if missing:
             raise ValueError("Missing required env vars: " + ", ".join(missing))
@@ -57,5 +80,11 @@ class Config:
             except ValueError as exc:
                 raise ValueError("NOTIFY_ONLY_ON_DAY must be integer") from exc
 
-        if self.enable_registration and not self.admin_chat_ids:
+        if self.notify_thresholds:
+            try:
+                [int(item) for item in self.notify_thresholds.split(",") if item.strip()]
+            except ValueError as exc:
+                raise ValueError("NOTIFY_THRESHOLDS must be comma-separated integers") from exc
+
+        if require_telegram and self.enable_registration and not self.admin_chat_ids:
             raise ValueError("ENABLE_REGISTRATION requires ADMIN_CHAT_IDS")
@@ -0,0 +1,174 @@
+import csv
+import datetime as dt
+import gzip
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from .clients import SnipeItClient
+from .parsing import (
+    extract_assigned_user,
+    extract_expiration,
+    index_user_map,
+    match_chat_ids,
+    pick_license_name,
+)
+
+EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
+EXPORT_COMPRESSIONS = ["none", "gzip", "zstd"]
+EXPORT_FIELDS = [
+    "license_id",
+    "license_name",
+    "expires",
+    "days_remaining",
+    "seat_id",
+    "user_id",
+    "username",
+    "email",
+    "chat_ids",
+]
+
+
+def iter_export_chunks(
+    client: SnipeItClient,
+    user_map: List[Dict[str, Any]],
+    fallback_chat_ids: List[str],
+    page_size: int = 100,
+    chunk_size: int = 500,
+) -> Iterator[List[Dict[str, Any]]]:
+    user_index = index_user_map(user_map)
+    today = dt.date.today()
+    licenses: List[Dict[str, Any]] = []
+    for license_row in client.get_paginated("/licenses", page_size=page_size):
+        licenses.append(license_row)
+        if len(licenses) >= chunk_size:
+            yield _build_rows(client, licenses, user_index, fallback_chat_ids, page_size, today)
+            licenses = []
+    if licenses:
+        yield _build_rows(client, licenses, user_index, fallback_chat_ids, page_size, today)
+
+
+def _build_rows(
+    client: SnipeItClient,
+    licenses: List[Dict[str, Any]],
+    user_index: Dict[str, Dict[Any, List[str]]],
+    fallback_chat_ids: List[str],
+    page_size: int,
+    today: dt.date,
+) -> List[Dict[str, Any]]:
+    seats_by_license = client.list_license_seats_many(
+        (int(row["id"]) for row in licenses if row.get("id") is not None),
+        page_size=page_size,
+    )
+    rows: List[Dict[str, Any]] = []
+    for license_row in licenses:
+        exp_date = extract_expiration(license_row)
+        base = {
+            "license_id": license_row.get("id"),
+            "license_name": pick_license_name(license_row),
+            "expires": exp_date.isoformat() if exp_date else None,
+            "days_remaining": (exp_date - today).days if exp_date else None,
+        }
+        seats: List[Optional[Dict[str, Any]]] = []
+        if license_row.get("id") is not None:
+            seats.extend(seats_by_license.get(int(license_row["id"]), []))
+        if not seats:
+            seats.append(None)
+        seat_users = [(extract_assigned_user(seat) if seat else None) or {} for seat in seats]
+        matched = [match_chat_ids(seat_user, [], user_index) for seat_user in seat_users]
+        # Same rule as build_notifications: fallback chats only get licenses with no matched seat.
+        fallback = [] if any(matched) else fallback_chat_ids
+        for seat, seat_user, seat_chat_ids in zip(seats, seat_users, matched):
+            chat_ids = seat_chat_ids or fallback
+            row = dict(base)
+            row.update(
+                {
+                    "seat_id": seat.get("id") if seat else None,
+                    "user_id": seat_user.get("id"),
+                    "username": seat_user.get("username") or seat_user.get("name"),
+                    "email": seat_user.get("email"),
+                    "chat_ids": ";".join(chat_ids),
+                }
+            )
+            rows.append(row)
+    return rows
+
+
+def _open_text(path: str, compression: str) -> TextIO:
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        try:
+            import zstandard  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError("zstandard package not installed. pip install zstandard") from exc
+        return zstandard.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _write_text(
+    chunks: Iterator[List[Dict[str, Any]]], path: str, fmt: str, compression: str
+) -> int:
+    total = 0
+    with _open_text(path, compression) as handle:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(handle, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+        for rows in chunks:
+            if writer is not None:
+                writer.writerows(rows)
+            else:
+                handle.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            total += len(rows)
+            logging.info("Exported %s rows", total)
+    return total
+
+
+def _write_parquet(chunks: Iterator[List[Dict[str, Any]]], path: str, compression: str) -> int:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("pyarrow package not installed. pip install pyarrow") from exc
+
+    schema = pa.schema(
+        [
+            ("license_id", pa.int64()),
+            ("license_name", pa.string()),
+            ("expires", pa.string()),
+            ("days_remaining", pa.int64()),
+            ("seat_id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("username", pa.string()),
+            ("email", pa.string()),
+            ("chat_ids", pa.string()),
+        ]
+    )
+    total = 0
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            total += len(rows)
+            logging.info("Exported %s rows", total)
+    return total
+
+
+def export_dataset(
+    client: SnipeItClient,
+    user_map: List[Dict[str, Any]],
+    fallback_chat_ids: List[str],
+    path: str,
+    fmt: str = "csv",
+    compression: str = "none",
+    page_size: int = 100,
+    chunk_size: int = 500,
+) -> int:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported export compression: {compression}")
+    chunks = iter_export_chunks(client, user_map, fallback_chat_ids, page_size, chunk_size)
+    if fmt == "parquet":
+        return _write_parquet(chunks, path, compression)
+    return _write_text(chunks, path, fmt, compression)
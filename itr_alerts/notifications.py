@@ -2,7 +2,13 @@ import datetime as dt
 from typing import Any, Dict, List, Optional
 
 from .clients import SnipeItClient
-from .parsing import extract_assigned_user, extract_expiration, match_chat_ids, pick_license_name
+from .parsing import (
+    extract_assigned_user,
+    extract_expiration,
+    index_user_map,
+    match_chat_ids,
+    pick_license_name,
+)
 
 
 def build_notifications(
@@ -14,53 +20,58 @@ def build_notifications(
     include_expired: bool,
     notify_only_on_day: Optional[int],
 ) -> Dict[str, List[Dict[str, Any]]]:
-    today = dt.date.today()
+    items = build_license_items(
+        licenses=licenses,
+        notify_days=notify_days,
+        include_expired=include_expired,
+        notify_only_on_day=notify_only_on_day,
+    )
+    seats_by_license = client.list_license_seats_many(
+        int(item["license_id"]) for item in items if item["license_id"] is not None
+    )
+    user_index = index_user_map(user_map)
     notifications: Dict[str, List[Dict[str, Any]]] = {}
 
-    for license_row in licenses:
-        exp_date = extract_expiration(license_row)
-        if not exp_date:
-            continue
-
-        days_remaining = (exp_date - today).days
-        if notify_only_on_day is not None and days_remaining != notify_only_on_day:
-            continue
-        if days_remaining < 0 and not include_expired:
-            continue
-        if days_remaining > notify_days:
-            continue
-
-        license_id = license_row.get("id")
-        license_name = pick_license_name(license_row)
+    for item in items:
+        license_id = item["license_id"]
 
         assigned_chat_ids: List[str] = []
         if license_id is not None:
-            seats = client.list_license_seats(int(license_id))
-            for seat in seats:
+            for seat in seats_by_license.get(int(license_id), []):
                 seat_user = extract_assigned_user(seat)
-                assigned_chat_ids.extend(match_chat_ids(seat_user, user_map))
+                assigned_chat_ids.extend(match_chat_ids(seat_user, user_map, user_index))
 
         if not assigned_chat_ids and fallback_chat_ids:
             assigned_chat_ids = fallback_chat_ids[:]
 
         for chat_id in dict.fromkeys(assigned_chat_ids):
-            notifications.setdefault(chat_id, []).append(
-                {
-                    "license_id": license_id,
-                    "license_name": license_name,
-                    "expires": exp_date,
-                    "days_remaining": days_remaining,
-                }
-            )
+            notifications.setdefault(chat_id, []).append(dict(item))
 
     return notifications
 
 
+def is_license_due(
+    days_remaining: int,
+    notify_days: int,
+    include_expired: bool,
+    notify_only_on_day: Optional[int],
+    thresholds: Optional[List[int]] = None,
+) -> bool:
+    if notify_only_on_day is not None and days_remaining != notify_only_on_day:
+        return False
+    if days_remaining < 0 and not include_expired:
+        return False
+    if thresholds:
+        return days_remaining < 0 or days_remaining in thresholds
+    return days_remaining <= notify_days
+
+
 def build_license_items(
     licenses: List[Dict[str, Any]],
     notify_days: int,
     include_expired: bool,
     notify_only_on_day: Optional[int],
+    thresholds: Optional[List[int]] = None,
 ) -> List[Dict[str, Any]]:
     today = dt.date.today()
     items: List[Dict[str, Any]] = []
@@ -70,11 +81,9 @@ def build_license_items(
             continue
 
         days_remaining = (exp_date - today).days
-        if notify_only_on_day is not None and days_remaining != notify_only_on_day:
-            continue
-        if days_remaining < 0 and not include_expired:
-            continue
-        if days_remaining > notify_days:
+        if not is_license_due(
+            days_remaining, notify_days, include_expired, notify_only_on_day, thresholds
+        ):
             continue
 
         license_id = license_row.get("id")
@@ -1,7 +1,9 @@
 import datetime as dt
 import json
+import marshal
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 DATE_FORMATS = [
@@ -14,6 +16,8 @@ DATE_FORMATS = [
     "%Y-%m-%dT%H:%M:%S.%f%z",
 ]
 
+USER_MAP_CACHE_SUFFIX = ".cache"
+
 
 def load_user_map(path: str) -> Tuple[List[Dict[str, Any]], List[str]]:
     resolved = _resolve_user_map_path(path)
@@ -21,8 +25,7 @@ def load_user_map(path: str) -> Tuple[List[Dict[str, Any]], List[str]]:
         data = {"users": [], "default_chat_ids": [], "pending_users": []}
         save_user_map(resolved, data)
         return [], []
-    with open(resolved, "r", encoding="utf-8") as handle:
-        data = json.load(handle)
+    data = _load_user_map_cached(resolved)
     if isinstance(data, list):
         users = data
         fallback = []
@@ -41,6 +44,41 @@ def _resolve_user_map_path(path: str) -> str:
     return path
 
 
+def _user_map_cache_key(resolved: str) -> Tuple[int, int, int]:
+    stat = os.stat(resolved)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _load_user_map_cached(resolved: str) -> Any:
+    # marshal only rebuilds plain data, so a tampered cache on a shared volume
+    # cannot run code the way a pickle could.
+    key = _user_map_cache_key(resolved)
+    cache_path = resolved + USER_MAP_CACHE_SUFFIX
+    try:
+        with open(cache_path, "rb") as handle:
+            cached = marshal.load(handle)
+        if (
+            isinstance(cached, tuple)
+            and len(cached) == 2
+            and cached[0] == key
+            and isinstance(cached[1], (dict, list))
+        ):
+            return cached[1]
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    with open(resolved, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            marshal.dump((key, data), handle)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        pass
+    return data
+
+
 def load_user_map_full(path: str) -> Dict[str, Any]:
     resolved = _resolve_user_map_path(path)
     if not os.path.exists(resolved):
@@ -58,11 +96,32 @@ def load_user_map_full(path: str) -> Dict[str, Any]:
     return data
 
 
+@contextmanager
+def user_map_lock(path: str) -> Iterator[None]:
+    # Serialises read-modify-write of the user map between --sync-users and the
+    # registration poller. POSIX only; on Windows the lock is a no-op.
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    resolved = _resolve_user_map_path(path)
+    os.makedirs(os.path.dirname(resolved) or ".", exist_ok=True)
+    with open(resolved + ".lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
 def save_user_map(path: str, data: Dict[str, Any]) -> None:
     resolved = _resolve_user_map_path(path)
     os.makedirs(os.path.dirname(resolved) or ".", exist_ok=True)
-    with open(resolved, "w", encoding="utf-8") as handle:
+    tmp_path = resolved + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
         json.dump(data, handle, ensure_ascii=True, indent=2)
+    os.replace(tmp_path, resolved)
 
 
 def parse_date(value: Any) -> Optional[dt.date]:
@@ -128,34 +187,53 @@ def extract_assigned_user(seat_row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _entry_chat_id(entry: Any) -> Optional[str]:
+    if not isinstance(entry, dict) or entry.get("stale"):
+        return None
+    chat_id = entry.get("telegram_chat_id") or entry.get("chat_id")
+    if not chat_id:
+        return None
+    return str(chat_id)
+
+
+def _user_id_key(value: Any) -> Any:
+    raw = str(value).strip()
+    return int(raw) if raw.isdigit() else raw
+
+
+def index_user_map(user_map: List[Dict[str, Any]]) -> Dict[str, Dict[Any, List[str]]]:
+    index: Dict[str, Dict[Any, List[str]]] = {"id": {}, "username": {}, "email": {}}
+    for entry in user_map:
+        chat_id = _entry_chat_id(entry)
+        if not chat_id:
+            continue
+        if entry.get("snipeit_user_id"):
+            index["id"].setdefault(_user_id_key(entry["snipeit_user_id"]), []).append(chat_id)
+        if entry.get("snipeit_username"):
+            index["username"].setdefault(str(entry["snipeit_username"]).lower(), []).append(chat_id)
+        if entry.get("snipeit_email"):
+            index["email"].setdefault(str(entry["snipeit_email"]).lower(), []).append(chat_id)
+    return index
+
+
 def match_chat_ids(
     seat_user: Optional[Dict[str, Any]],
     user_map: List[Dict[str, Any]],
+    index: Optional[Dict[str, Dict[Any, List[str]]]] = None,
 ) -> List[str]:
     if not seat_user:
         return []
+    if index is None:
+        index = index_user_map(user_map)
     user_id = seat_user.get("id")
     username = seat_user.get("username") or seat_user.get("name")
     email = seat_user.get("email")
 
     matched: List[str] = []
-    for entry in user_map:
-        if not isinstance(entry, dict):
-            continue
-        chat_id = entry.get("telegram_chat_id") or entry.get("chat_id")
-        if not chat_id:
-            continue
-        chat_id = str(chat_id)
-        if entry.get("snipeit_user_id") and user_id is not None:
-            if str(entry.get("snipeit_user_id")) == str(user_id):
-                matched.append(chat_id)
-                continue
-        if entry.get("snipeit_username") and username:
-            if str(entry.get("snipeit_username")).lower() == str(username).lower():
-                matched.append(chat_id)
-                continue
-        if entry.get("snipeit_email") and email:
-            if str(entry.get("snipeit_email")).lower() == str(email).lower():
-                matched.append(chat_id)
-                continue
+    if user_id is not None:
+        matched.extend(index["id"].get(_user_id_key(user_id), []))
+    if username:
+        matched.extend(index["username"].get(str(username).lower(), []))
+    if email:
+        matched.extend(index["email"].get(str(email).lower(), []))
     return list(dict.fromkeys(matched))
@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from .clients import TelegramClient
 
-from .parsing import load_user_map_full, save_user_map
+from .parsing import load_user_map_full, save_user_map, user_map_lock
 
 
 def _user_keyboard() -> Dict[str, Any]:
@@ -40,11 +40,23 @@ def _find_pending(pending: List[Dict[str, Any]], chat_id: str) -> Optional[Dict[
 
 def _find_user(users: List[Dict[str, Any]], chat_id: str) -> Optional[Dict[str, Any]]:
     for item in users:
-        if str(item.get("telegram_chat_id")) == str(chat_id):
+        if str(item.get("telegram_chat_id")) == str(chat_id) and not item.get("stale"):
             return item
     return None
 
 
+def _drop_stale(users: List[Dict[str, Any]], chat_id: str) -> bool:
+    # Stale entries no longer resolve in Snipe-IT; the chat has to go through approval again.
+    stale = [
+        item
+        for item in users
+        if str(item.get("telegram_chat_id")) == str(chat_id) and item.get("stale")
+    ]
+    for item in stale:
+        users.remove(item)
+    return bool(stale)
+
+
 def _parse_command(text: str) -> Tuple[str, List[str]]:
     parts = text.strip().split()
     if not parts:
@@ -114,130 +126,133 @@ def process_updates(
     max_update_id: Optional[int] = None
     scan_requested = False
 
-    data = load_user_map_full(user_map_path)
-    users = data.get("users", [])
-    pending = data.get("pending_users", [])
-
-    for update in updates:
-        update_id = update.get("update_id")
-        if isinstance(update_id, int):
-            if max_update_id is None or update_id > max_update_id:
-                max_update_id = update_id
-        message = update.get("message") or {}
-        text = (message.get("text") or "").strip()
-        chat = message.get("chat") or {}
-        chat_id = str(chat.get("id", ""))
-        if not chat_id:
-            continue
-        command, args = _parse_command(text)
-
-        if chat_id in admin_chat_ids and command in {"/approve", "/deny", "/scan_now"}:
-            if command == "/scan_now":
-                telegram.send_message(
-                    chat_id, "Запрос на сканирование. Отправка уведомлений...", reply_markup=_admin_keyboard()
-                )
-                scan_requested = True
-            elif command == "/deny":
-                target_id = args[0] if args else None
-                if not target_id:
+    with user_map_lock(user_map_path):
+        data = load_user_map_full(user_map_path)
+        users = data.get("users", [])
+        pending = data.get("pending_users", [])
+
+        for update in updates:
+            update_id = update.get("update_id")
+            if isinstance(update_id, int):
+                if max_update_id is None or update_id > max_update_id:
+                    max_update_id = update_id
+            message = update.get("message") or {}
+            text = (message.get("text") or "").strip()
+            chat = message.get("chat") or {}
+            chat_id = str(chat.get("id", ""))
+            if not chat_id:
+                continue
+            command, args = _parse_command(text)
+
+            if chat_id in admin_chat_ids and command in {"/approve", "/deny", "/scan_now"}:
+                if command == "/scan_now":
                     telegram.send_message(
-                        chat_id,
-                        "Usage: /deny <chat_id>",
-                        reply_markup=_admin_keyboard(),
+                        chat_id, "Запрос на сканирование. Отправка уведомлений...", reply_markup=_admin_keyboard()
                     )
+                    scan_requested = True
+                elif command == "/deny":
+                    target_id = args[0] if args else None
+                    if not target_id:
+                        telegram.send_message(
+                            chat_id,
+                            "Usage: /deny <chat_id>",
+                            reply_markup=_admin_keyboard(),
+                        )
+                    else:
+                        pending_entry = _find_pending(pending, target_id)
+                        if pending_entry:
+                            pending.remove(pending_entry)
+                            save_user_map(user_map_path, data)
+                            telegram.send_message(chat_id, f"Denied {target_id}")
+                        else:
+                            telegram.send_message(chat_id, f"Not found: {target_id}")
                 else:
-                    pending_entry = _find_pending(pending, target_id)
-                    if pending_entry:
-                        pending.remove(pending_entry)
-                        save_user_map(user_map_path, data)
-                        telegram.send_message(chat_id, f"Denied {target_id}")
+                    target_id, mapping = _parse_approve_args(args)
+                    if not target_id:
+                        telegram.send_message(
+                            chat_id,
+                            "Используйте: /approve <chat_id> [email|username|id <value>]",
+                            reply_markup=_admin_keyboard(),
+                        )
                     else:
-                        telegram.send_message(chat_id, f"Not found: {target_id}")
+                        pending_entry = _find_pending(pending, target_id)
+                        if not pending_entry:
+                            telegram.send_message(chat_id, f"Не найден: {target_id}")
+                        else:
+                            if not mapping:
+                                mapping = _collect_mapping_from_pending(pending_entry)
+                            if not mapping:
+                                telegram.send_message(
+                                    chat_id,
+                                    "Предоставьте параметры: /approve <chat_id> email <x> or username <x> or id <x>",
+                                    reply_markup=_admin_keyboard(),
+                                )
+                            else:
+                                user_entry = _build_user_entry(
+                                    target_id, pending_entry, mapping
+                                )
+                                _drop_stale(users, target_id)
+                                users.append(user_entry)
+                                pending.remove(pending_entry)
+                                save_user_map(user_map_path, data)
+                                telegram.send_message(chat_id, f"Одобрено {target_id}")
+                                telegram.send_message(
+                                    target_id,
+                                    "Регистрация одобрена. Вы будете получать уведомления.",
+                                    reply_markup=_user_keyboard(),
+                                )
             else:
-                target_id, mapping = _parse_approve_args(args)
-                if not target_id:
+                if command not in {"/start", "/register"}:
+                    continue
+                if _find_user(users, chat_id):
                     telegram.send_message(
-                        chat_id,
-                        "Используйте: /approve <chat_id> [email|username|id <value>]",
-                        reply_markup=_admin_keyboard(),
+                        chat_id, "Уже зарегистрирован.", reply_markup=_user_keyboard()
                     )
-                else:
-                    pending_entry = _find_pending(pending, target_id)
-                    if not pending_entry:
-                        telegram.send_message(chat_id, f"Не найден: {target_id}")
+                    continue
+                if _find_pending(pending, chat_id):
+                    telegram.send_message(
+                        chat_id, "Ожидает подтверждения.", reply_markup=_user_keyboard()
+                    )
+                    continue
+                _drop_stale(users, chat_id)
+
+                requested_email = None
+                requested_username = None
+                requested_user_id = None
+                if args:
+                    value = args[0]
+                    if "@" in value:
+                        requested_email = value
+                    elif value.isdigit():
+                        requested_user_id = value
                     else:
-                        if not mapping:
-                            mapping = _collect_mapping_from_pending(pending_entry)
-                        if not mapping:
-                            telegram.send_message(
-                                chat_id,
-                                "Предоставьте параметры: /approve <chat_id> email <x> or username <x> or id <x>",
-                                reply_markup=_admin_keyboard(),
-                            )
-                        else:
-                            user_entry = _build_user_entry(
-                                target_id, pending_entry, mapping
-                            )
-                            users.append(user_entry)
-                            pending.remove(pending_entry)
-                            save_user_map(user_map_path, data)
-                            telegram.send_message(chat_id, f"Одобрено {target_id}")
-                            telegram.send_message(
-                                target_id,
-                                "Регистрация одобрена. Вы будете получать уведомления.",
-                                reply_markup=_user_keyboard(),
-                            )
-        else:
-            if command not in {"/start", "/register"}:
-                continue
-            if _find_user(users, chat_id):
-                telegram.send_message(
-                    chat_id, "Уже зарегистрирован.", reply_markup=_user_keyboard()
-                )
-                continue
-            if _find_pending(pending, chat_id):
+                        requested_username = value
+
+                pending_entry = {
+                    "telegram_chat_id": chat_id,
+                    "first_name": chat.get("first_name"),
+                    "last_name": chat.get("last_name"),
+                    "username": chat.get("username"),
+                    "requested_email": requested_email,
+                    "requested_username": requested_username,
+                    "requested_user_id": requested_user_id,
+                    "requested_at": dt.datetime.utcnow().isoformat() + "Z",
+                    "admin_notified_at": None,
+                }
+                pending.append(pending_entry)
+                save_user_map(user_map_path, data)
                 telegram.send_message(
-                    chat_id, "Ожидает подтверждения.", reply_markup=_user_keyboard()
+                    chat_id,
+                    "Регистрация запрошена. Ожидание подтверждения администратора.",
+                    reply_markup=_user_keyboard(),
                 )
-                continue
-
-            requested_email = None
-            requested_username = None
-            requested_user_id = None
-            if args:
-                value = args[0]
-                if "@" in value:
-                    requested_email = value
-                elif value.isdigit():
-                    requested_user_id = value
-                else:
-                    requested_username = value
-
-            pending_entry = {
-                "telegram_chat_id": chat_id,
-                "first_name": chat.get("first_name"),
-                "last_name": chat.get("last_name"),
-                "username": chat.get("username"),
-                "requested_email": requested_email,
-                "requested_username": requested_username,
-                "requested_user_id": requested_user_id,
-                "requested_at": dt.datetime.utcnow().isoformat() + "Z",
-                "admin_notified_at": None,
-            }
-            pending.append(pending_entry)
-            save_user_map(user_map_path, data)
-            telegram.send_message(
-                chat_id,
-                "Регистрация запрошена. Ожидание подтверждения администратора.",
-                reply_markup=_user_keyboard(),
-            )
-            for admin_id in admin_chat_ids:
-                telegram.send_message(
-                    admin_id,
-                    f"Ожидающий пользователь: {chat_id}. Одобрить с помощью /approve {chat_id} email <x> or username <x> or id <x>",
-                    reply_markup=_admin_keyboard(),
-                )
-            pending_entry["admin_notified_at"] = dt.datetime.utcnow().isoformat() + "Z"
+                for admin_id in admin_chat_ids:
+                    telegram.send_message(
+                        admin_id,
+                        f"Ожидающий пользователь: {chat_id}. Одобрить с помощью /approve {chat_id} email <x> or username <x> or id <x>",
+                        reply_markup=_admin_keyboard(),
+                    )
+                pending_entry["admin_notified_at"] = dt.datetime.utcnow().isoformat() + "Z"
 
     if max_update_id is not None:
         state["telegram_offset"] = max_update_id + 1
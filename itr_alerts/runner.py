@@ -1,22 +1,116 @@
+import datetime as dt
 import logging
 import os
 import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
+from . import simulation
 from .clients import SnipeItClient, TelegramClient
 from .config import Config
-from .notifications import build_license_items, build_message, build_notifications
-from .parsing import load_user_map
+from .export import export_dataset
+from .notifications import (
+    build_license_items,
+    build_message,
+    is_license_due,
+)
+from .parsing import extract_expiration, load_user_map
 from .registration import process_updates
+from .throttle import AdaptiveLimiter, CircuitBreaker
+from .timeline import ExpiryTimeline, parse_thresholds
+from .transport import get_session
+from .user_sync import sync_user_map
 
+_SNIPEIT_CLIENTS: Dict[str, SnipeItClient] = {}
 
-def run_once(config: Config) -> int:
-    client = SnipeItClient(config.base_url, config.api_token, config.timeout_seconds)
-    telegram = TelegramClient(config.telegram_token, config.timeout_seconds, config.dry_run)
 
-    user_map, fallback = load_user_map(config.user_map_path)
-    if config.fallback_chat_id:
-        fallback.append(str(config.fallback_chat_id))
-        fallback = list(dict.fromkeys(fallback))
+def _session(config: Config, name: str) -> Any:
+    return get_session(
+        name,
+        pool_connections=config.http_pool_connections,
+        pool_maxsize=config.http_pool_maxsize,
+        retries=config.http_retries,
+        backoff_factor=config.http_backoff,
+        http2=config.http2,
+        # A retried getUpdates long poll would block for another full poll timeout.
+        retry_reads=name != "telegram",
+    )
+
+
+def _snipeit_client(config: Config) -> SnipeItClient:
+    # Cached so the adaptive limit and breaker state carry over between scheduled runs.
+    client = _SNIPEIT_CLIENTS.get(config.base_url)
+    if client is None:
+        client = _build_snipeit_client(config, _session(config, "snipeit"))
+        _SNIPEIT_CLIENTS[config.base_url] = client
+    return client
+
+
+def _build_snipeit_client(
+    config: Config,
+    session: Any,
+    clock: Optional[Callable[[], float]] = None,
+    sleep: Optional[Callable[[float], None]] = None,
+) -> SnipeItClient:
+    # clock/sleep are only overridden by the simulation's virtual clock.
+    clock = clock or time.monotonic
+    return SnipeItClient(
+        config.base_url,
+        config.api_token,
+        config.timeout_seconds,
+        session=session,
+        limiter=AdaptiveLimiter(
+            initial=max(config.snipeit_min_concurrency, config.snipeit_max_concurrency // 2),
+            minimum=config.snipeit_min_concurrency,
+            maximum=config.snipeit_max_concurrency,
+            target_latency_seconds=config.snipeit_target_latency_ms / 1000,
+            clock=clock,
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=config.circuit_failure_threshold,
+            reset_seconds=config.circuit_reset_seconds,
+            clock=clock,
+            sleep=sleep,
+        ),
+        max_attempts=config.snipeit_max_attempts,
+        clock=clock,
+        sleep=sleep or time.sleep,
+    )
+
+
+def _telegram_client(config: Config) -> TelegramClient:
+    return TelegramClient(
+        config.telegram_token,
+        config.timeout_seconds,
+        config.dry_run,
+        session=_session(config, "telegram"),
+    )
+
+
+def _thresholds(config: Config) -> List[int]:
+    if not config.notify_thresholds:
+        return []
+    return parse_thresholds(config.notify_thresholds)
+
+
+def run_once(
+    config: Config,
+    client: Optional[SnipeItClient] = None,
+    telegram: Optional[TelegramClient] = None,
+    recipients: Optional[List[str]] = None,
+) -> int:
+    _scan(config, client, telegram, recipients)
+    return 0
+
+
+def _scan(
+    config: Config,
+    client: Optional[SnipeItClient] = None,
+    telegram: Optional[TelegramClient] = None,
+    recipients: Optional[List[str]] = None,
+    since: Optional[dt.date] = None,
+    sent: Optional[Set[Tuple[Any, ...]]] = None,
+) -> Optional[ExpiryTimeline]:
+    client = client or _snipeit_client(config)
 
     licenses = client.list_licenses(page_size=config.page_size)
     logging.info("Loaded %s licenses", len(licenses))
@@ -24,29 +118,158 @@ def run_once(config: Config) -> int:
     notify_only_on_day = (
         int(config.notify_only_on_day) if config.notify_only_on_day else None
     )
+    thresholds = _thresholds(config)
 
     items = build_license_items(
         licenses=licenses,
         notify_days=config.notify_days,
         include_expired=config.include_expired,
         notify_only_on_day=notify_only_on_day,
+        thresholds=thresholds,
     )
 
-    if not items:
-        logging.info("No notifications to send")
-        return 0
+    timeline: Optional[ExpiryTimeline] = None
+    if thresholds:
+        # Crossings between the previous refresh and today that the old timeline
+        # never saw (licenses added since) are sent late instead of being lost.
+        timeline = ExpiryTimeline(licenses, thresholds, since=since)
+        listed = {_item_key(item) for item in items}
+        for item in _filter_due(config, timeline, timeline.pop_due()):
+            if _item_key(item) not in listed and _sent_key(item) not in (sent or set()):
+                items.append(item)
+
+    _send_items(config, items, telegram, recipients)
+
+    if timeline is None:
+        return None
+    logging.info(
+        "Expiry timeline: %s pending crossings, next on %s",
+        len(timeline),
+        timeline.next_crossing(),
+    )
+    return timeline
+
+
+def _item_key(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    return item["license_id"], item["license_name"], item["expires"]
+
+
+def _sent_key(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    return item["license_id"], item["expires"], item.get("threshold")
+
+
+def _filter_due(
+    config: Config, timeline: ExpiryTimeline, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    # Crossings can surface late, so the exact-threshold check is replaced by the
+    # window up to the largest threshold; the other filters match build_license_items.
+    notify_only_on_day = (
+        int(config.notify_only_on_day) if config.notify_only_on_day else None
+    )
+    return [
+        item
+        for item in items
+        if is_license_due(
+            item["days_remaining"],
+            max(timeline.thresholds),
+            config.include_expired,
+            notify_only_on_day,
+        )
+    ]
 
-    recipients = [str(entry.get("telegram_chat_id")) for entry in user_map if entry.get("telegram_chat_id")]
+
+def _confirm_expiry(
+    client: SnipeItClient,
+    timeline: ExpiryTimeline,
+    items: List[Dict[str, Any]],
+    today: dt.date,
+) -> List[Dict[str, Any]]:
+    # The timeline may be days old; re-read each due license so renewals and
+    # deletions since the last refresh do not produce wrong alerts.
+    confirmed: List[Dict[str, Any]] = []
+    changed = False
+    for item in items:
+        if item["license_id"] is None:
+            confirmed.append(item)
+            continue
+        license_row = client.get_license(int(item["license_id"]))
+        exp_date = extract_expiration(license_row) if license_row else None
+        if exp_date == item["expires"]:
+            confirmed.append(item)
+            continue
+        logging.info(
+            "License %s expiry changed (%s -> %s), skipping stale crossing",
+            item["license_id"],
+            item["expires"],
+            exp_date,
+        )
+        if license_row and exp_date:
+            timeline.add(license_row, since=today)
+            changed = True
+    if changed:
+        confirmed.extend(timeline.pop_due(today))
+    return confirmed
+
+
+def _recipients(config: Config) -> List[str]:
+    user_map, fallback = load_user_map(config.user_map_path)
+    if config.fallback_chat_id:
+        fallback.append(str(config.fallback_chat_id))
+    recipients = [
+        str(entry.get("telegram_chat_id"))
+        for entry in user_map
+        if entry.get("telegram_chat_id") and not entry.get("stale")
+    ]
     recipients.extend(fallback)
     recipients.extend(config.admin_chat_ids)
-    recipients = list(dict.fromkeys([r for r in recipients if r]))
+    return list(dict.fromkeys([r for r in recipients if r]))
+
 
+def _send_items(
+    config: Config,
+    items: List[Dict[str, Any]],
+    telegram: Optional[TelegramClient] = None,
+    recipients: Optional[List[str]] = None,
+) -> None:
+    if not items:
+        logging.info("No notifications to send")
+        return
+
+    telegram = telegram or _telegram_client(config)
+    if recipients is None:
+        recipients = _recipients(config)
+
+    thresholds = _thresholds(config)
+    window_days = max(thresholds) if thresholds else config.notify_days
+    message = build_message(items, window_days)
     for chat_id in recipients:
-        message = build_message(items, config.notify_days)
         telegram.send_message(chat_id, message)
         logging.info("Sent %s items to chat %s", len(items), chat_id)
 
-    return 0
+
+def _run_due(config: Config, state: Dict[str, Any]) -> None:
+    today = dt.date.today()
+    timeline: Optional[ExpiryTimeline] = state.get("timeline")
+    refreshed_on: Optional[dt.date] = state.get("refreshed_on")
+    if (
+        timeline is None
+        or refreshed_on is None
+        or (today - refreshed_on).days >= config.timeline_refresh_days
+    ):
+        since = refreshed_on + dt.timedelta(days=1) if refreshed_on else None
+        state["timeline"] = _scan(config, since=since, sent=state.get("sent"))
+        state["refreshed_on"] = today
+        state["sent"] = set()
+        return
+
+    next_crossing = timeline.next_crossing()
+    if next_crossing is None or next_crossing > today:
+        logging.info("No threshold crossings today, next on %s", next_crossing)
+        return
+    items = _confirm_expiry(_snipeit_client(config), timeline, timeline.pop_due(today), today)
+    items = _filter_due(config, timeline, items)
+    _send_items(config, items)
+    state.setdefault("sent", set()).update(_sent_key(item) for item in items)
 
 
 def run_schedule(config: Config) -> int:
@@ -55,7 +278,12 @@ def run_schedule(config: Config) -> int:
     except ImportError as exc:
         raise RuntimeError("schedule package not installed. pip install schedule") from exc
 
-    schedule.every().day.at(config.schedule_time).do(run_once, config)
+    if _thresholds(config):
+        # Daily tick only peeks at the timeline; the inventory is re-fetched
+        # when a refresh is due.
+        schedule.every().day.at(config.schedule_time).do(_run_due, config, {})
+    else:
+        schedule.every().day.at(config.schedule_time).do(run_once, config)
     if config.enable_registration:
         schedule.every(config.poll_seconds).seconds.do(_poll_updates_and_scan, config)
     logging.info("Scheduler started: daily at %s", config.schedule_time)
@@ -64,10 +292,73 @@ def run_schedule(config: Config) -> int:
         time.sleep(1)
 
 
-def _poll_updates_and_scan(config: Config) -> None:
+def run_export(config: Config, path: str, fmt: str, compression: str) -> int:
+    user_map, fallback = load_user_map(config.user_map_path)
+    if config.fallback_chat_id:
+        fallback.append(str(config.fallback_chat_id))
+        fallback = list(dict.fromkeys(fallback))
+    total = export_dataset(
+        _snipeit_client(config),
+        user_map,
+        fallback,
+        path,
+        fmt=fmt,
+        compression=compression,
+        page_size=config.page_size,
+        chunk_size=config.export_chunk_size,
+    )
+    logging.info("Export finished: %s rows written to %s", total, path)
+    return 0
+
+
+def run_simulation(
+    config: Config, dataset_path: str, license_count: int, chat_count: int
+) -> int:
+    if dataset_path:
+        dataset = simulation.load_dataset(dataset_path)
+    else:
+        dataset = simulation.synthetic_dataset(license_count, chat_count)
+    # Recipients come from the dataset only: simulate mode never reads or creates
+    # the production user map and ignores ADMIN_CHAT_IDS / FALLBACK_CHAT_ID.
+    recipients = simulation.dataset_recipients(dataset)
+    logging.info(
+        "Simulation: %s licenses, %s recipients", len(dataset["licenses"]), len(recipients)
+    )
+    stats, snipeit_session, telegram_session = simulation.build_sessions(
+        dataset,
+        snipeit_latency_ms=config.sim_snipeit_latency_ms,
+        snipeit_rate_per_minute=config.sim_snipeit_rate_per_minute,
+        telegram_latency_ms=config.sim_telegram_latency_ms,
+        telegram_rate_per_second=config.sim_telegram_rate_per_second,
+        telegram_per_chat_per_second=config.sim_telegram_per_chat_per_second,
+    )
+    # The real client runs on the virtual clock, so retries, AIMD and the circuit
+    # breaker react to simulated 429s without sleeping in real time.
+    client = _build_snipeit_client(
+        config, snipeit_session, clock=stats.clock.now, sleep=stats.clock.sleep
+    )
+    client.limiter = stats.snipeit.limiter = simulation.VirtualSlots(client.limiter, stats.clock)
+    # dry_run stays off so every send reaches the simulated session and is counted.
     telegram = TelegramClient(
-        config.telegram_token, config.timeout_seconds, config.dry_run
+        config.telegram_token, config.timeout_seconds, dry_run=False, session=telegram_session
     )
+    exit_code = 0
+    try:
+        run_once(config, client=client, telegram=telegram, recipients=recipients)
+    except Exception as exc:
+        logging.error("Simulation: run aborted, the real run would fail the same way: %s", exc)
+        exit_code = 1
+    simulation.report(stats)
+    return exit_code
+
+
+def run_sync_users(config: Config) -> int:
+    sync_user_map(_snipeit_client(config), config.user_map_path, page_size=config.page_size)
+    return 0
+
+
+def _poll_updates_and_scan(config: Config) -> None:
+    telegram = _telegram_client(config)
     scan_requested = process_updates(
         telegram=telegram,
         user_map_path=config.user_map_path,
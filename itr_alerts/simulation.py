@@ -0,0 +1,396 @@
+import bisect
+import contextvars
+import datetime as dt
+import json
+import logging
+import math
+import random
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_SEATS_RE = re.compile(r"/licenses/(\d+)/seats$")
+_LICENSE_RE = re.compile(r"/licenses/(\d+)$")
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class SimulatedHTTPError(IOError):
+    def __init__(self, message: str, response: "SimulatedResponse") -> None:
+        super().__init__(message)
+        self.response = response
+
+
+class SimulatedResponse:
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.status_code = status_code
+        self.headers: Dict[str, str] = headers or {}
+        self._payload = payload
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def raise_for_status(self) -> None:
+        if self.status_code < 400:
+            return None
+        raise SimulatedHTTPError(
+            f"{self.status_code} {self._payload.get('description') or 'simulated error'}", self
+        )
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+
+class VirtualClock:
+    # Virtual time lives in a context variable: pool tasks run in a copy of the
+    # submitter's context, so each starts at the moment it was submitted, and
+    # sleeping only moves the current task forward. The main thread continues
+    # only once everything it waited on has completed.
+    def __init__(self) -> None:
+        self.horizon = 0.0
+        self.slept_seconds = 0.0
+        self._now: "contextvars.ContextVar[float]" = contextvars.ContextVar(
+            "virtual_now", default=0.0
+        )
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        moment = self._now.get()
+        if threading.current_thread() is threading.main_thread():
+            with self._lock:
+                moment = max(moment, self.horizon)
+            self._now.set(moment)
+        return moment
+
+    def advance_to(self, moment: float) -> None:
+        if moment > self._now.get():
+            self._now.set(moment)
+        with self._lock:
+            self.horizon = max(self.horizon, moment)
+
+    def sleep(self, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        with self._lock:
+            self.slept_seconds += seconds
+        self.advance_to(self.now() + seconds)
+
+
+class RateWindow:
+    # Sliding window: at most `limit` accepted requests in any `window_seconds`;
+    # rejected requests do not count, like Laravel's throttle middleware.
+    def __init__(self, limit: int, window_seconds: float) -> None:
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._accepted: List[float] = []
+
+    def admit(self, start: float) -> Optional[float]:
+        if self.limit <= 0:
+            return None
+        first = bisect.bisect_right(self._accepted, start - self.window_seconds)
+        last = bisect.bisect_right(self._accepted, start)
+        if last - first >= self.limit:
+            return self._accepted[last - self.limit] + self.window_seconds - start
+        bisect.insort(self._accepted, start)
+        return None
+
+
+class ApiModel:
+    def __init__(self, name: str, latency_seconds: float, window: RateWindow) -> None:
+        self.name = name
+        self.latency_seconds = latency_seconds
+        self.window = window
+        self.limiter: Optional["VirtualSlots"] = None
+        self.calls = 0
+        self.rejected = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class VirtualSlots:
+    # Wraps the client's AdaptiveLimiter: every acquired slot is also a lane on the
+    # virtual clock, so at most int(limit) requests overlap in simulated time.
+    def __init__(self, limiter: Any, clock: VirtualClock) -> None:
+        self.limiter = limiter
+        self.clock = clock
+        self._idle: List[float] = []
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.limiter, name)
+
+    def acquire(self) -> None:
+        self.limiter.acquire()
+        now = self.clock.now()
+        with self._lock:
+            free = max(1, int(self.limiter.limit) - self._busy)
+            if len(self._idle) > free:
+                del self._idle[free:]
+            self._idle.extend([0.0] * (free - len(self._idle)))
+            start = max(now, self._idle.pop(0))
+            self._busy += 1
+        self.clock.advance_to(start)
+
+    def release(self, latency_seconds: Optional[float] = None, throttled: bool = False) -> None:
+        with self._lock:
+            self._busy -= 1
+            bisect.insort(self._idle, self.clock.now())
+        self.limiter.release(latency_seconds, throttled=throttled)
+
+
+class SimulationStats:
+    def __init__(
+        self,
+        snipeit: ApiModel,
+        telegram: ApiModel,
+        per_chat_per_second: int,
+    ) -> None:
+        self.snipeit = snipeit
+        self.telegram = telegram
+        self.per_chat_per_second = per_chat_per_second
+        self.clock = VirtualClock()
+        self.messages_per_chat: Dict[str, int] = {}
+        self.oversized_messages: List[Tuple[str, int]] = []
+        self._chat_windows: Dict[str, RateWindow] = {}
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        model: ApiModel,
+        request_bytes: int,
+        respond: Callable[[], SimulatedResponse],
+        rejected: Callable[[int], SimulatedResponse],
+        chat_id: Optional[str] = None,
+    ) -> SimulatedResponse:
+        # If the global or per-chat rate window is full when the call arrives it is
+        # answered with a 429 and Retry-After, otherwise it is served after the latency.
+        start = self.clock.now()
+        with self._lock:
+            wait = None
+            if chat_id is not None:
+                chat_window = self._chat_windows.setdefault(
+                    chat_id, RateWindow(self.per_chat_per_second, 1.0)
+                )
+                wait = chat_window.admit(start)
+            if wait is None:
+                wait = model.window.admit(start)
+            if wait is not None:
+                response = rejected(max(1, math.ceil(wait)))
+                model.rejected += 1
+            else:
+                response = respond()
+                if chat_id is not None:
+                    self.messages_per_chat[chat_id] = self.messages_per_chat.get(chat_id, 0) + 1
+            model.calls += 1
+            model.bytes_sent += request_bytes
+            model.bytes_received += len(response.content)
+        self.clock.advance_to(start + model.latency_seconds)
+        return response
+
+
+class SimulatedSnipeItSession:
+    def __init__(self, stats: SimulationStats, dataset: Dict[str, Any]) -> None:
+        self.stats = stats
+        self.licenses: List[Dict[str, Any]] = dataset.get("licenses", [])
+        self.seats: Dict[str, List[Dict[str, Any]]] = dataset.get("seats", {})
+        self.users: List[Dict[str, Any]] = dataset.get("users", [])
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **_: Any) -> SimulatedResponse:
+        params = params or {}
+        return self.stats.call(
+            self.stats.snipeit,
+            len(url) + len(json.dumps(params)),
+            lambda: self._respond(url, params),
+            lambda retry_after: SimulatedResponse(
+                {"status": "error", "messages": "Too Many Attempts."},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            ),
+        )
+
+    def _respond(self, url: str, params: Dict[str, Any]) -> SimulatedResponse:
+        match = _LICENSE_RE.search(url)
+        if match:
+            license_id = int(match.group(1))
+            for license_row in self.licenses:
+                if str(license_row.get("id")) == str(license_id):
+                    return SimulatedResponse(license_row)
+            return SimulatedResponse({"status": "error", "messages": "License not found"})
+        if url.endswith("/licenses"):
+            rows = self.licenses
+        elif url.endswith("/users"):
+            rows = self.users
+        else:
+            match = _SEATS_RE.search(url)
+            rows = self.seats.get(match.group(1), []) if match else []
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", len(rows) or 1))
+        return SimulatedResponse({"total": len(rows), "rows": rows[offset : offset + limit]})
+
+    def close(self) -> None:
+        return None
+
+
+class SimulatedTelegramSession:
+    def __init__(self, stats: SimulationStats) -> None:
+        self.stats = stats
+
+    def post(self, url: str, json: Optional[Dict[str, Any]] = None, **_: Any) -> SimulatedResponse:
+        payload = json or {}
+        chat_id = str(payload.get("chat_id"))
+        text = str(payload.get("text") or "")
+        request_bytes = len(url) + len(_json_dumps(payload).encode("utf-8"))
+        if len(text) > TELEGRAM_MAX_MESSAGE_LENGTH:
+            # Telegram rejects the message outright; it never counts against the rate limit.
+            self.stats.oversized_messages.append((chat_id, len(text)))
+            return self.stats.call(
+                self.stats.telegram,
+                request_bytes,
+                lambda: _telegram_error(400, "Bad Request: message is too long"),
+                lambda retry_after: _telegram_error(400, "Bad Request: message is too long"),
+            )
+        return self.stats.call(
+            self.stats.telegram,
+            request_bytes,
+            lambda: SimulatedResponse({"ok": True, "result": {}}),
+            lambda retry_after: _telegram_error(
+                429, f"Too Many Requests: retry after {retry_after}", retry_after
+            ),
+            chat_id=chat_id,
+        )
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **_: Any) -> SimulatedResponse:
+        return self.stats.call(
+            self.stats.telegram,
+            len(url),
+            lambda: SimulatedResponse({"ok": True, "result": []}),
+            lambda retry_after: _telegram_error(
+                429, f"Too Many Requests: retry after {retry_after}", retry_after
+            ),
+        )
+
+    def close(self) -> None:
+        return None
+
+
+def _telegram_error(
+    status_code: int, description: str, retry_after: Optional[int] = None
+) -> SimulatedResponse:
+    payload: Dict[str, Any] = {"ok": False, "error_code": status_code, "description": description}
+    headers: Dict[str, str] = {}
+    if retry_after is not None:
+        payload["parameters"] = {"retry_after": retry_after}
+        headers["Retry-After"] = str(retry_after)
+    return SimulatedResponse(payload, status_code=status_code, headers=headers)
+
+
+def _json_dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def synthetic_dataset(license_count: int, chat_count: int = 100, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    today = dt.date.today()
+    licenses: List[Dict[str, Any]] = []
+    for license_id in range(1, license_count + 1):
+        expires = today + dt.timedelta(days=rng.randint(-30, 365))
+        licenses.append(
+            {
+                "id": license_id,
+                "name": f"license-{license_id}",
+                "expiration_date": {"date": expires.isoformat()},
+            }
+        )
+    users = [
+        {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com"}
+        for user_id in range(1, chat_count + 1)
+    ]
+    user_map = [
+        {"snipeit_user_id": user["id"], "telegram_chat_id": 100000000 + user["id"]}
+        for user in users
+    ]
+    return {"licenses": licenses, "seats": {}, "users": users, "user_map": user_map}
+
+
+def load_dataset(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    if isinstance(data, list):
+        data = {"licenses": data}
+    data.setdefault("licenses", [])
+    data.setdefault("seats", {})
+    data.setdefault("users", [])
+    data.setdefault("user_map", [])
+    return data
+
+
+def dataset_recipients(dataset: Dict[str, Any]) -> List[str]:
+    user_map = dataset.get("user_map") or []
+    fallback: List[Any] = []
+    if isinstance(user_map, dict):
+        fallback = user_map.get("default_chat_ids") or []
+        user_map = user_map.get("users") or []
+    recipients = [
+        str(entry.get("telegram_chat_id"))
+        for entry in user_map
+        if isinstance(entry, dict) and entry.get("telegram_chat_id") and not entry.get("stale")
+    ]
+    recipients.extend(str(item) for item in fallback)
+    return list(dict.fromkeys([r for r in recipients if r.strip()]))
+
+
+def build_sessions(
+    dataset: Dict[str, Any],
+    snipeit_latency_ms: int,
+    snipeit_rate_per_minute: int,
+    telegram_latency_ms: int,
+    telegram_rate_per_second: int,
+    telegram_per_chat_per_second: int,
+) -> Tuple[SimulationStats, SimulatedSnipeItSession, SimulatedTelegramSession]:
+    stats = SimulationStats(
+        snipeit=ApiModel(
+            "snipeit", snipeit_latency_ms / 1000, RateWindow(snipeit_rate_per_minute, 60.0)
+        ),
+        telegram=ApiModel(
+            "telegram", telegram_latency_ms / 1000, RateWindow(telegram_rate_per_second, 1.0)
+        ),
+        per_chat_per_second=telegram_per_chat_per_second,
+    )
+    return stats, SimulatedSnipeItSession(stats, dataset), SimulatedTelegramSession(stats)
+
+
+def report(stats: SimulationStats) -> None:
+    logging.info(
+        "Simulation: projected wall time %.2f s (%.2f s of retry backoff and circuit pauses "
+        "summed over requests)",
+        max(stats.clock.horizon, stats.clock.now()),
+        stats.clock.slept_seconds,
+    )
+    for model in (stats.snipeit, stats.telegram):
+        logging.info(
+            "Simulation: %s %s calls, %s rejected with 429, %s bytes sent, %s bytes received",
+            model.name,
+            model.calls,
+            model.rejected,
+            model.bytes_sent,
+            model.bytes_received,
+        )
+    slots = stats.snipeit.limiter
+    if slots is not None:
+        logging.info(
+            "Simulation: snipeit concurrency limit ended at %s (max %s)",
+            int(slots.limit),
+            slots.maximum,
+        )
+    for chat_id, count in sorted(stats.messages_per_chat.items()):
+        logging.info("Simulation: chat %s would receive %s messages", chat_id, count)
+    for chat_id, length in stats.oversized_messages:
+        logging.warning(
+            "Simulation: message to chat %s is %s characters, over Telegram's %s limit",
+            chat_id,
+            length,
+            TELEGRAM_MAX_MESSAGE_LENGTH,
+        )
@@ -0,0 +1,44 @@
+import importlib
+import logging
+import sys
+import time
+from typing import Iterable, List, Tuple
+
+
+HEAVY_MODULES = ["requests", "schedule"]
+
+
+def time_imports(modules: Iterable[str]) -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    for name in modules:
+        if name in sys.modules:
+            timings.append((name, 0.0))
+            continue
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logging.warning("Startup profile: module %s is not installed", name)
+            continue
+        timings.append((name, (time.perf_counter() - started) * 1000))
+    return timings
+
+
+def report_startup(base_ms: float, dotenv_ms: float) -> float:
+    timings = [("dotenv", dotenv_ms)] + time_imports(HEAVY_MODULES)
+    total_ms = base_ms + sum(ms for _, ms in timings)
+    logging.info("Startup profile: base imports %.1f ms", base_ms)
+    for name, ms in timings:
+        logging.info("Startup profile: import %s %.1f ms", name, ms)
+    logging.info("Startup profile: total %.1f ms", total_ms)
+    return total_ms
+
+
+def check_budget(total_ms: float, budget_ms: int) -> int:
+    if budget_ms and total_ms > budget_ms:
+        logging.warning(
+            "Startup profile: %.1f ms exceeds STARTUP_BUDGET_MS=%s", total_ms, budget_ms
+        )
+        return 1
+    logging.info("Startup profile: within budget of %s ms", budget_ms)
+    return 0
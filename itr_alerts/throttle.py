@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        target_latency_seconds: float = 1.0,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.target_latency_seconds = target_latency_seconds
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._clock = clock
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency_seconds: Optional[float] = None, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled or (
+                latency_seconds is not None and latency_seconds > self.target_latency_seconds
+            ):
+                # At most one multiplicative decrease per latency window, so a burst of
+                # concurrent 429s counts as a single congestion signal.
+                now = self._clock()
+                if now - self._last_decrease >= self.target_latency_seconds:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif latency_seconds is not None:
+                # Additive increase: roughly +1 slot per full window of healthy responses.
+                self.limit = min(self.maximum, self.limit + 1.0 / max(1.0, self.limit))
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+
+    def wait_until_closed(self) -> None:
+        # Half-open: once the pause is over a single caller goes through as a probe;
+        # the rest keep waiting until the probe closes or re-opens the circuit.
+        logged = False
+        with self._cond:
+            while self.opened_at is not None:
+                remaining = self.opened_at + self.reset_seconds - self._clock()
+                if remaining > 0:
+                    if not logged:
+                        logging.warning("Snipe-IT circuit open, pausing for %.1f s", remaining)
+                        logged = True
+                    self._pause(remaining)
+                elif not self._probing:
+                    self._probing = True
+                    return
+                else:
+                    self._cond.wait()
+
+    def _pause(self, seconds: float) -> None:
+        # A custom sleep (the simulation's virtual clock) cannot be woken early by notify.
+        if self._sleep is None:
+            self._cond.wait(seconds)
+            return
+        self._cond.release()
+        try:
+            self._sleep(seconds)
+        finally:
+            self._cond.acquire()
+
+    def record_success(self) -> None:
+        with self._cond:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.warning(
+                        "Snipe-IT circuit opened after %s consecutive failures", self.failures
+                    )
+                self.opened_at = self._clock()
+                self._probing = False
+                self._cond.notify_all()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils  # only needed for the rare HTTP-date form
+
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
@@ -0,0 +1,73 @@
+import datetime as dt
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+from .parsing import extract_expiration, pick_license_name
+
+
+def parse_thresholds(value: str) -> List[int]:
+    thresholds = {int(item.strip()) for item in value.split(",") if item.strip()}
+    return sorted(thresholds, reverse=True)
+
+
+class ExpiryTimeline:
+    def __init__(
+        self,
+        licenses: List[Dict[str, Any]],
+        thresholds: List[int],
+        since: Optional[dt.date] = None,
+    ) -> None:
+        since = since or dt.date.today()
+        self.thresholds = sorted(set(thresholds), reverse=True)
+        self._seq = 0
+        self._heap: List[Tuple[dt.date, int, int, Dict[str, Any]]] = []
+        for license_row in licenses:
+            self._heap.extend(self._entries(license_row, since))
+        heapq.heapify(self._heap)
+
+    def _entries(
+        self, license_row: Dict[str, Any], since: dt.date
+    ) -> List[Tuple[dt.date, int, int, Dict[str, Any]]]:
+        exp_date = extract_expiration(license_row)
+        if not exp_date:
+            return []
+        info = {
+            "license_id": license_row.get("id"),
+            "license_name": pick_license_name(license_row),
+            "expires": exp_date,
+        }
+        entries = []
+        for threshold in self.thresholds:
+            crossing = exp_date - dt.timedelta(days=threshold)
+            if crossing < since:
+                continue
+            entries.append((crossing, threshold, self._seq, info))
+            self._seq += 1
+        return entries
+
+    def add(self, license_row: Dict[str, Any], since: Optional[dt.date] = None) -> None:
+        for entry in self._entries(license_row, since or dt.date.today()):
+            heapq.heappush(self._heap, entry)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def next_crossing(self) -> Optional[dt.date]:
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due(self, today: Optional[dt.date] = None) -> List[Dict[str, Any]]:
+        today = today or dt.date.today()
+        due: Dict[int, Dict[str, Any]] = {}
+        while self._heap and self._heap[0][0] <= today:
+            _, threshold, _, info = heapq.heappop(self._heap)
+            # Missed days can surface several thresholds for one license; keep one item.
+            due[id(info)] = {
+                "license_id": info["license_id"],
+                "license_name": info["license_name"],
+                "expires": info["expires"],
+                "days_remaining": (info["expires"] - today).days,
+                "threshold": threshold,
+            }
+        return list(due.values())
@@ -0,0 +1,95 @@
+import logging
+import threading
+from typing import Any, Dict
+
+_SESSIONS: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+def get_session(
+    name: str,
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    http2: bool = False,
+    retry_reads: bool = True,
+) -> Any:
+    # One session per API name so credentials never leak between hosts.
+    with _LOCK:
+        session = _SESSIONS.get(name)
+        if session is None:
+            if http2:
+                session = _build_http2_session(pool_maxsize, retries)
+            if session is None:
+                session = _build_requests_session(
+                    pool_connections, pool_maxsize, retries, backoff_factor, retry_reads
+                )
+            _SESSIONS[name] = session
+        return session
+
+
+def close_sessions() -> None:
+    with _LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+
+
+def _build_requests_session(
+    pool_connections: int,
+    pool_maxsize: int,
+    retries: int,
+    backoff_factor: float,
+    retry_reads: bool,
+) -> Any:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry_kwargs: Dict[str, Any] = {
+        "total": retries,
+        "connect": retries,
+        "read": retries if retry_reads else 0,
+        "status": 0,
+        "backoff_factor": backoff_factor,
+        "allowed_methods": frozenset({"GET"}),
+        "raise_on_status": False,
+    }
+    try:
+        retry = Retry(backoff_jitter=backoff_factor, **retry_kwargs)
+    except TypeError:  # urllib3 < 2.0 has no jitter support
+        retry = Retry(**retry_kwargs)
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_http2_session(pool_maxsize: int, retries: int) -> Any:
+    try:
+        import httpx
+    except ImportError:
+        logging.warning("HTTP2 requested but httpx is not installed. pip install httpx[http2]")
+        return None
+    try:
+        limits = httpx.Limits(
+            max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+        )
+        client = httpx.Client(
+            transport=httpx.HTTPTransport(http2=True, limits=limits, retries=retries)
+        )
+    except ImportError:
+        logging.warning("HTTP2 requested but h2 is not installed. pip install httpx[http2]")
+        return None
+    logging.warning(
+        "HTTP2 session: httpx retries connection errors only, without backoff/jitter; "
+        "HTTP_BACKOFF and HTTP_POOL_CONNECTIONS are ignored"
+    )
+    return client
@@ -0,0 +1,77 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from .clients import SnipeItClient
+from .parsing import load_user_map_full, save_user_map, user_map_lock
+
+
+def _build_directory(
+    client: SnipeItClient, page_size: int
+) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    by_id: Dict[int, Dict[str, Any]] = {}
+    by_username: Dict[str, Dict[str, Any]] = {}
+    by_email: Dict[str, Dict[str, Any]] = {}
+    for user in client.get_paginated("/users", page_size=page_size):
+        user_id = user.get("id")
+        if user_id is None or not str(user_id).isdigit():
+            continue
+        by_id[int(user_id)] = user
+        if user.get("username"):
+            by_username[str(user["username"]).lower()] = user
+        if user.get("email"):
+            by_email[str(user["email"]).lower()] = user
+    return by_id, by_username, by_email
+
+
+def _resolve_entry(
+    entry: Dict[str, Any],
+    by_id: Dict[int, Dict[str, Any]],
+    by_username: Dict[str, Dict[str, Any]],
+    by_email: Dict[str, Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    user_id = str(entry.get("snipeit_user_id") or "").strip()
+    if user_id.isdigit() and int(user_id) in by_id:
+        return by_id[int(user_id)]
+    if entry.get("snipeit_username"):
+        user = by_username.get(str(entry["snipeit_username"]).lower())
+        if user:
+            return user
+    if entry.get("snipeit_email"):
+        user = by_email.get(str(entry["snipeit_email"]).lower())
+        if user:
+            return user
+    return None
+
+
+def sync_user_map(client: SnipeItClient, user_map_path: str, page_size: int = 100) -> Tuple[int, int]:
+    by_id, by_username, by_email = _build_directory(client, page_size)
+    logging.info("Loaded %s Snipe-IT users", len(by_id))
+
+    resolved = 0
+    stale = 0
+    with user_map_lock(user_map_path):
+        data = load_user_map_full(user_map_path)
+        for entry in data.get("users", []):
+            if not isinstance(entry, dict):
+                continue
+            if not any(
+                entry.get(key) for key in ("snipeit_user_id", "snipeit_username", "snipeit_email")
+            ):
+                # Bare /approve entries have nothing to resolve; keep them as recipients.
+                entry.pop("stale", None)
+                continue
+            user = _resolve_entry(entry, by_id, by_username, by_email)
+            if user is None:
+                entry["stale"] = True
+                stale += 1
+                logging.warning(
+                    "User map entry no longer resolves: %s", entry.get("telegram_chat_id")
+                )
+                continue
+            entry["snipeit_user_id"] = int(user["id"])
+            entry.pop("stale", None)
+            resolved += 1
+
+        save_user_map(user_map_path, data)
+    logging.info("User map sync: %s resolved, %s stale", resolved, stale)
+    return resolved, stale
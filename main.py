@@ -1,38 +1,117 @@
+import time
+
+_STARTED_AT = time.perf_counter()
+
 import argparse
 import sys
 
-try:
-    from dotenv import load_dotenv
-except Exception:  # pragma: no cover - optional dependency
-    load_dotenv = None
-
 from itr_alerts.config import Config
-from itr_alerts.runner import run_once, run_schedule, setup_logging
+from itr_alerts.export import EXPORT_COMPRESSIONS, EXPORT_FORMATS
+from itr_alerts.runner import (
+    run_export,
+    run_once,
+    run_schedule,
+    run_simulation,
+    run_sync_users,
+    setup_logging,
+)
+from itr_alerts.transport import close_sessions
 
+_IMPORTS_MS = (time.perf_counter() - _STARTED_AT) * 1000
 
-def main() -> int:
-    if load_dotenv:
-        load_dotenv()
 
+def _load_dotenv() -> float:
+    started = time.perf_counter()
+    try:
+        from dotenv import load_dotenv
+    except Exception:  # pragma: no cover - optional dependency
+        return 0.0
+    import_ms = (time.perf_counter() - started) * 1000
+    load_dotenv()
+    return import_ms
+
+
+def main() -> int:
+    dotenv_ms = _load_dotenv()
     setup_logging()
 
     parser = argparse.ArgumentParser(description="Snipe-IT license expiry notifier")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
     parser.add_argument("--schedule", action="store_true", help="Run in scheduler mode")
+    parser.add_argument(
+        "--sync-users",
+        action="store_true",
+        help="Resolve user map entries against Snipe-IT /users and exit",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="PATH",
+        help="Write licenses, seats and recipients to PATH and exit",
+    )
+    parser.add_argument(
+        "--export-format", choices=EXPORT_FORMATS, default="csv", help="Export file format"
+    )
+    parser.add_argument(
+        "--export-compression",
+        choices=EXPORT_COMPRESSIONS,
+        default="none",
+        help="Export compression",
+    )
+    parser.add_argument(
+        "--simulate",
+        nargs="?",
+        const="",
+        metavar="DATASET",
+        help="Run the pipeline against a recorded JSON dataset (or synthetic data) and report projected cost",
+    )
+    parser.add_argument(
+        "--simulate-licenses",
+        type=int,
+        default=1000,
+        help="Number of synthetic licenses when --simulate has no dataset",
+    )
+    parser.add_argument(
+        "--simulate-chats",
+        type=int,
+        default=100,
+        help="Number of synthetic recipient chats when --simulate has no dataset",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import time against STARTUP_BUDGET_MS and exit",
+    )
     args = parser.parse_args()
 
+    if args.profile_startup:
+        from itr_alerts.startup import check_budget, report_startup
+
+        total_ms = report_startup(_IMPORTS_MS, dotenv_ms)
+        return check_budget(total_ms, Config().startup_budget_ms)
+
     config = Config()
     config.normalize()
-    config.validate()
+    if args.simulate is not None:
+        return run_simulation(
+            config, args.simulate, args.simulate_licenses, args.simulate_chats
+        )
+    config.validate(require_telegram=not (args.sync_users or args.export))
 
     if args.schedule:
         config.run_mode = "schedule"
     if args.once:
         config.run_mode = "once"
 
-    if config.run_mode == "schedule":
-        return run_schedule(config)
-    return run_once(config)
+    try:
+        if args.sync_users:
+            return run_sync_users(config)
+        if args.export:
+            return run_export(config, args.export, args.export_format, args.export_compression)
+        if config.run_mode == "schedule":
+            return run_schedule(config)
+        return run_once(config)
+    finally:
+        close_sessions()
 
 
 if __name__ == "__main__":